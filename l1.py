@@ -1,29 +1,36 @@
 import sys
+import operator
 # this is for testing the l1 layer of the model, which is just a simple arithmetic script for now. The predict_score.py script will be the main one that uses the model to predict football scores, and it will call this l1.py script as a subprocess to do the actual calculations.
 # simple arithmetic script expects three arguments:
 #   python l1.py <num1> <operator> <num2>
 # where <operator> is one of + - * /
+
+# one hash lookup instead of an if/elif chain over the operators
+OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
 if len(sys.argv) != 4:
     print("Usage: python l1.py <num1> <operator> <num2>")
     sys.exit(1)
 
 try:
     num1 = int(sys.argv[1])
-    operator = sys.argv[2]
+    op = sys.argv[2]
     num2 = int(sys.argv[3])
 except ValueError:
     print("Error: first and third arguments must be integers")
     sys.exit(1)
 
-if operator == "+":
-    print(num1+num2)
-elif operator == "-":
-    print(num1-num2)    
-elif operator == "*":
-    print(num1*num2)
-elif operator == "/":
-    if num2 == 0:
-        print("Error: Division by zero")
-    else:
-        print(num1/num2)  
-else:    print("Error: Invalid operator")
+fn = OPS.get(op)
+if fn is None:
+    print("Error: Invalid operator")
+    sys.exit(1)
+
+if op == "/" and num2 == 0:
+    print("Error: Division by zero")
+else:
+    print(fn(num1, num2))
@@ -6,90 +6,224 @@ Usage:
 
 The script fetches current LaLiga standings from ESPN, computes simple
 attack/defense strengths, and predicts the most likely scoreline between
-two chosen teams using independent Poisson models.
+two chosen teams using a bivariate Poisson model whose shared component
+captures the correlation between the teams' goal counts.
 """
 import sys
+import hashlib
+import heapq
 import math
 import random
-##import requests
+import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
 try:
-    from bs4 import BeautifulSoup
+    import requests
+except Exception:
+    requests = None
+
+try:
+    import requests_cache
+except Exception:
+    requests_cache = None
+
+try:
+    from bs4 import BeautifulSoup, SoupStrainer
 except Exception:
     BeautifulSoup = None
+    SoupStrainer = None
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# Prefer the C-based lxml parser when available; it is several times faster
+# than the pure-Python html.parser on ESPN's large pages.
+try:
+    import lxml  # noqa: F401
+    BS_PARSER = "lxml"
+except Exception:
+    BS_PARSER = "html.parser"
+
+# <script>/<style> subtrees are dead weight for standings parsing; strip them
+# before handing the page to BeautifulSoup.
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_SCRIPT_STYLE_RE_B = re.compile(rb"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+# Hot-loop character scans, bound to the compiled methods so the work runs in
+# the C regex engine rather than a per-character Python generator.
+_HAS_ALPHA = re.compile(r"[^\W\d_]").search
+_NUM_RE = re.compile(r"^[+-]?\d+$").match
 
 ESP_NATIVES = [
     "https://www.espn.com/soccer/standings/_/league/ESP.1",
     "https://www.espn.com/soccer/table/_/league/ESP.1",
 ]
 
+# ESPN's JSON standings endpoint returns the same data as the HTML pages in
+# tens of milliseconds with nothing to parse; the scraper is kept as fallback.
+JSON_URL = "https://site.api.espn.com/apis/v2/sports/soccer/esp.1/standings"
+
+# API stat names -> the column keys parse_standings produces.
+_JSON_STAT_KEYS = {
+    "gamesPlayed": "GP",
+    "wins": "W",
+    "ties": "D",
+    "losses": "L",
+    "pointsFor": "F",
+    "pointsAgainst": "A",
+    "pointDifferential": "GD",
+    "points": "PTS",
+}
+
+
+_session = None
+
+
+def _get_session():
+    """Return the HTTP client, preferring an on-disk cache when available.
+
+    ESPN responses routinely take 1.5-2.5s; caching them for an hour (and
+    revalidating via ETag/Last-Modified) makes repeat runs near-instant.
+    Falls back to the plain requests module when requests_cache is not
+    installed. The session is created lazily so importing this module has
+    no filesystem side effects.
+    """
+    global _session
+    if _session is None:
+        if requests_cache is not None:
+            _session = requests_cache.CachedSession(
+                ".espn_cache", expire_after=3600, cache_control=True)
+        else:
+            _session = requests
+    return _session
 
-def fetch_html(url):
+
+def fetch_bytes(url):
+    session = _get_session()
+    if session is None:
+        raise RuntimeError("requests is required. Install with: pip install requests")
     headers = {"User-Agent": "Mozilla/5.0 (compatible)"}
-    r = requests.get(url, headers=headers, timeout=10)
+    r = session.get(url, headers=headers, timeout=10)
     r.raise_for_status()
-    return r.text
+    # Return the raw body: decoding to str here would only be undone by the
+    # parser, and lxml's own charset detection on bytes is faster anyway.
+    return r.content
+
+
+def _iter_table_rows(table):
+    """Yield <tr> elements of a table in one pass, descending into
+    thead/tbody/tfoot sections without a recursive find_all walk."""
+    for section in table.children:
+        name = getattr(section, "name", None)
+        if name == "tr":
+            yield section
+        elif name in ("thead", "tbody", "tfoot"):
+            for child in section.children:
+                if getattr(child, "name", None) == "tr":
+                    yield child
 
 
+@lru_cache(maxsize=4)
 def parse_standings(html):
-    """Return dict: team_name -> stats dict with keys GP, W, D, L, F, A, GD, PTS"""
+    """Return dict: team_name -> stats dict with keys GP, W, D, L, F, A, GD, PTS
+
+    `html` may be bytes (as returned by fetch_bytes) or str; bytes go to the
+    parser undecoded.
+    """
     if BeautifulSoup is None:
         raise RuntimeError("BeautifulSoup (bs4) is required. Install with: pip install beautifulsoup4")
 
-    soup = BeautifulSoup(html, "html.parser")
+    if isinstance(html, bytes):
+        html = _SCRIPT_STYLE_RE_B.sub(b"", html)
+    else:
+        html = _SCRIPT_STYLE_RE.sub("", html)
+    # Only build tree nodes for <table> subtrees; the rest of the page
+    # (navigation, ads, markup boilerplate) is never consulted.
+    soup = BeautifulSoup(html, BS_PARSER, parse_only=SoupStrainer("table"))
     # Find table containing headers like 'W' 'L' 'F' 'A' 'GD' 'P'
-    candidates = soup.find_all("table")
+    candidates = [t for t in soup.contents if getattr(t, "name", None) == "table"]
     for table in candidates:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        header_text = " ".join(headers).upper()
-        if all(x in header_text for x in ("W", "L", "F", "A", "GD", "PTS")):
-            # parse rows
-            rows = table.find_all("tr")
-            teams = {}
-            for tr in rows:
-                cols = [td.get_text(strip=True) for td in tr.find_all(["td"]) ]
-                if not cols:
+        # Single traversal per table: header detection and column extraction
+        # happen in one pass over the row children instead of separate
+        # find_all walks for th, tr and td.
+        teams = {}
+        is_standings = False
+        for tr in _iter_table_rows(table):
+            cols = []
+            ths = []
+            for cell in tr.children:
+                cell_name = getattr(cell, "name", None)
+                if cell_name == "td":
+                    cols.append(cell.get_text(strip=True))
+                elif cell_name == "th":
+                    ths.append(cell.get_text(strip=True))
+            if not is_standings:
+                if not ths:
                     continue
-                # Many ESPN tables put team name in first or second column; find a name column
-                name = None
-                for c in cols[:3]:
-                    if any(ch.isalpha() for ch in c):
-                        name = c
-                        break
-                if name is None:
+                # Header row: check for 'W' 'L' 'F' 'A' 'GD' 'PTS'
+                header_text = " ".join(ths).upper()
+                if all(x in header_text for x in ("W", "L", "F", "A", "GD", "PTS")):
+                    is_standings = True
                     continue
-                # Normalize name: remove rank prefix if present
-                name = name.strip()
-                # Attempt to extract numeric stats from trailing columns
-                nums = []
-                for c in cols:
-                    try:
-                        nums.append(int(c))
-                    except Exception:
-                        # maybe contains '34-21' style or 'F-A'
-                        pass
-                if len(nums) >= 8:
-                    GP, W, D, L, F, A, GD, PTS = nums[:8]
-                    teams[name] = {"GP": GP, "W": W, "D": D, "L": L, "F": F, "A": A, "GD": GD, "PTS": PTS}
-            if teams:
-                return teams
+                break  # wrong table; skip it without walking its rows
+            if not cols:
+                continue
+            # Many ESPN tables put team name in first or second column; find a name column
+            name = None
+            for c in cols[:3]:
+                if _HAS_ALPHA(c):
+                    name = c
+                    break
+            if name is None:
+                continue
+            # Normalize name: remove rank prefix if present
+            name = name.strip()
+            # Attempt to extract numeric stats from trailing columns. Most
+            # cells are non-numeric (names, '34-21' records), so test before
+            # converting instead of raising and catching a ValueError each time.
+            nums = []
+            for c in cols:
+                if c.isdecimal() or (c[:1] in '+-' and c[1:].isdecimal()):
+                    nums.append(int(c))
+            if len(nums) >= 8:
+                GP, W, D, L, F, A, GD, PTS = nums[:8]
+                teams[name] = {"GP": GP, "W": W, "D": D, "L": L, "F": F, "A": A, "GD": GD, "PTS": PTS}
+        if teams:
+            return teams
 
     # Fallback: try to parse textual listings like '1 Real Madrid 24 19 3 2 53 19 60'
-    text = soup.get_text(separator="\n")
+    # This rarely-taken path needs the whole document, so parse it in full here
+    # rather than paying for the complete tree on the common table path.
+    text = BeautifulSoup(html, BS_PARSER).get_text(separator="\n")
     teams = {}
     for line in text.splitlines():
-        parts = line.strip().split()
+        line = line.strip()
+        # Lines of interest start with a rank digit; skip everything else
+        # before paying for the split.
+        if not line[:1].isdigit():
+            continue
+        parts = line.split()
         if len(parts) >= 9 and parts[0].isdigit():
             # position, maybe shortclub, then name tokens, then numbers
-            # find last 8 numeric tokens
-            nums = []
+            # collect the last 8 numeric tokens right-to-left and reverse
+            # once, instead of O(n) insert(0, ...) per token
+            tail = []
             for token in reversed(parts):
-                if token.lstrip('+-').isdigit():
-                    nums.insert(0, int(token))
-                    if len(nums) == 8:
+                if _NUM_RE(token):
+                    tail.append(int(token))
+                    if len(tail) == 8:
                         break
-            if len(nums) == 8:
+            if len(tail) == 8:
+                nums = tail[::-1]
                 # name is middle
                 name_tokens = parts[1:len(parts)-8]
                 name = " ".join(name_tokens)
@@ -98,16 +232,58 @@ def parse_standings(html):
     return teams
 
 
+def fetch_json_standings():
+    """Return the same team -> stats dict as parse_standings, sourced from
+    ESPN's JSON standings API instead of scraping the HTML page."""
+    session = _get_session()
+    if session is None:
+        raise RuntimeError("requests is required. Install with: pip install requests")
+    headers = {"User-Agent": "Mozilla/5.0 (compatible)"}
+    r = session.get(JSON_URL, headers=headers, timeout=10)
+    r.raise_for_status()
+    data = r.json()
+    teams = {}
+    for entry in data["children"][0]["standings"]["entries"]:
+        name = entry["team"]["displayName"]
+        stats = {}
+        for stat in entry["stats"]:
+            key = _JSON_STAT_KEYS.get(stat.get("name"))
+            if key is not None:
+                stats[key] = int(stat["value"])
+        if len(stats) == len(_JSON_STAT_KEYS):
+            teams[name] = stats
+    return teams
+
+
 def get_current_standings():
-    last_err = None
-    for url in ESP_NATIVES:
-        try:
-            html = fetch_html(url)
-            teams = parse_standings(html)
-            if teams:
-                return teams
-        except Exception as e:
-            last_err = e
+    # Try the JSON API first; it is both faster and far cheaper than the
+    # HTML pages, which stay as the fallback path below.
+    try:
+        teams = fetch_json_standings()
+        if teams:
+            return teams
+    except Exception:
+        pass
+    # Fetch all candidate URLs in parallel and use the first successful
+    # parse; trying them serially pays the full ~2s ESPN latency on a slow
+    # or dead primary before the mirror is even attempted.
+    with ThreadPoolExecutor(max_workers=len(ESP_NATIVES)) as ex:
+        futures = [ex.submit(fetch_bytes, url) for url in ESP_NATIVES]
+        seen = set()
+        for fut in as_completed(futures):
+            try:
+                html = fut.result()
+                # League aliases often serve byte-identical pages; skip
+                # re-parsing a body we have already seen.
+                digest = hashlib.blake2b(html, digest_size=8).digest()
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                teams = parse_standings(html)
+                if teams:
+                    return teams
+            except Exception:
+                continue
     # If fetching/parsing failed, use a randomized fallback so the script still runs
     print("Warning: could not fetch live standings — using random fallback standings.")
     return generate_random_standings()
@@ -148,6 +324,42 @@ def poisson_pmf(k, lam):
     return (lam**k) * math.exp(-lam) / math.factorial(k)
 
 
+if njit is not None and np is not None:
+    @njit(cache=True)
+    def _poisson_grid(lamb1, lamb2, lam0, n):
+        # Bivariate Poisson score grid: the three component pmfs are built
+        # with running power/factorial products, then the shared component
+        # lam0 is convolved along the diagonal. lam0=0 reduces to the plain
+        # outer product of the marginals.
+        p1 = np.empty(n)
+        p2 = np.empty(n)
+        p0 = np.empty(n)
+        e1 = math.exp(-lamb1)
+        e2 = math.exp(-lamb2)
+        e0 = math.exp(-lam0)
+        f = 1.0
+        pw1 = 1.0
+        pw2 = 1.0
+        pw0 = 1.0
+        for k in range(n):
+            p1[k] = e1 * pw1 / f
+            p2[k] = e2 * pw2 / f
+            p0[k] = e0 * pw0 / f
+            f *= k + 1
+            pw1 *= lamb1
+            pw2 *= lamb2
+            pw0 *= lam0
+        grid = np.zeros((n, n))
+        for k in range(n):
+            w = p0[k]
+            for x in range(k, n):
+                for y in range(k, n):
+                    grid[x, y] += w * p1[x - k] * p2[y - k]
+        return grid
+else:
+    _poisson_grid = None
+
+
 def predict_scoreline(team1_stats, team2_stats, max_goals=6):
     # Compute per-game rates
     t1_gp = team1_stats.get('GP', 1)
@@ -161,25 +373,76 @@ def predict_scoreline(team1_stats, team2_stats, max_goals=6):
     lamb1 = (t1_gf_pg + t2_ga_pg) / 2.0
     lamb2 = (t2_gf_pg + t1_ga_pg) / 2.0
 
-    # compute joint probabilities for scorelines up to max_goals-1
-    best = None
+    # Bivariate Poisson: a shared component lam0 captures the correlation
+    # between the two teams' goal counts. The independent components are
+    # reduced by lam0 so the marginal means remain lamb1 and lamb2.
+    lam0 = 0.1 * min(lamb1, lamb2)
+    l1c = lamb1 - lam0
+    l2c = lamb2 - lam0
+
+    if np is not None:
+        # Vectorized path: the independent part of the grid is an outer
+        # product of the two component pmf vectors, the shared component is
+        # convolved along the diagonal, and the top-6 comes from
+        # argpartition instead of materializing and sorting a Python list.
+        # Numba, when present, fuses the whole grid into one compiled kernel.
+        if _poisson_grid is not None:
+            flat = _poisson_grid(l1c, l2c, lam0, max_goals).ravel()
+        else:
+            k = np.arange(max_goals)
+            fact = np.cumprod(np.concatenate(([1.0], np.arange(1.0, max_goals))))
+            p1s = np.exp(-l1c) * l1c ** k / fact
+            p2s = np.exp(-l2c) * l2c ** k / fact
+            p0s = np.exp(-lam0) * lam0 ** k / fact
+            grid = np.zeros((max_goals, max_goals))
+            for j in range(max_goals):
+                grid[j:, j:] += p0s[j] * np.outer(p1s[:max_goals - j], p2s[:max_goals - j])
+            flat = grid.ravel()
+        n_top = min(6, flat.size)
+        top_idx = np.argpartition(-flat, n_top - 1)[:n_top]
+        top_idx = top_idx[np.argsort(-flat[top_idx])]
+        top = [(divmod(int(i), max_goals), float(flat[i])) for i in top_idx]
+        best = top[0]
+        return {"expected": best[0], "prob": best[1], "top": top, "lambda": (lamb1, lamb2)}
+
+    # Precompute the three component pmf vectors once: exp(-lam) is a
+    # constant and the factorial builds up by a running product, so each
+    # scoreline below is a short sum of products.
+    exp1 = math.exp(-l1c)
+    exp2 = math.exp(-l2c)
+    exp0 = math.exp(-lam0)
+    p1s = []
+    p2s = []
+    p0s = []
+    fact = 1.0
+    for k in range(max_goals):
+        if k:
+            fact *= k
+        p1s.append(exp1 * l1c ** k / fact)
+        p2s.append(exp2 * l2c ** k / fact)
+        p0s.append(exp0 * lam0 ** k / fact)
+
+    # compute joint probabilities for scorelines up to max_goals-1; the
+    # shared component sums over the possible number of common goals
     all_probs = []
     for g1 in range(0, max_goals):
-        p1 = poisson_pmf(g1, lamb1)
         for g2 in range(0, max_goals):
-            p2 = poisson_pmf(g2, lamb2)
-            prob = p1 * p2
+            prob = 0.0
+            for k in range(min(g1, g2) + 1):
+                prob += p0s[k] * p1s[g1 - k] * p2s[g2 - k]
             all_probs.append(((g1, g2), prob))
-            if best is None or prob > best[1]:
-                best = ((g1, g2), prob)
 
-    # sort top results
-    top = sorted(all_probs, key=lambda x: x[1], reverse=True)[:6]
+    # top-6 via a bounded heap rather than a full O(N log N) sort; the
+    # most likely scoreline falls out as the head of the result.
+    top = heapq.nlargest(6, all_probs, key=lambda x: x[1])
+    best = top[0]
     return {"expected": best[0], "prob": best[1], "top": top, "lambda": (lamb1, lamb2)}
 
 
-def choose_team(teams, prompt):
-    names = sorted(teams.keys())
+def choose_team(names, lowered, prompt):
+    """Pick a team from the prebuilt sorted `names` list (with its parallel
+    lowercased copy) by number or substring; built once in main and reused
+    for both picks."""
     print("Available teams:")
     for i, n in enumerate(names, 1):
         print(f"{i}. {n}")
@@ -189,8 +452,9 @@ def choose_team(teams, prompt):
         return names[idx-1]
     except Exception:
         # try match by name
-        for n in names:
-            if choice.lower() in n.lower():
+        choice_lower = choice.lower()
+        for n, low in zip(names, lowered):
+            if choice_lower in low:
                 return n
     raise ValueError("Invalid team selection")
 
@@ -202,10 +466,12 @@ def main():
         print("Could not fetch standings. Exiting.")
         return
 
-    # allow user to pick two teams
+    # allow user to pick two teams; sort and lowercase the names once
+    names = sorted(teams)
+    lowered = [n.lower() for n in names]
     try:
-        t1 = choose_team(teams, "Choose home team (number or name): ")
-        t2 = choose_team(teams, "Choose away team (number or name): ")
+        t1 = choose_team(names, lowered, "Choose home team (number or name): ")
+        t2 = choose_team(names, lowered, "Choose away team (number or name): ")
     except Exception as e:
         print("Error selecting teams:", e)
         return